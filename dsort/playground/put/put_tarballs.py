@@ -1,6 +1,6 @@
 # coding: utf-8
 
-import io, tarfile, argparse, os
+import io, tarfile, argparse, os, collections
 import six
 import openapi_client
 
@@ -8,17 +8,22 @@ parser = argparse.ArgumentParser(description='Generate and put tarballs.')
 parser.add_argument('--ext', type=str, default='.tar', help='extension for tarballs (either `.tar` or `.tgz`)')
 parser.add_argument('--bucket', type=str, default='dsort-testing', help='bucket where shards will be put')
 parser.add_argument('--url', type=str, default='http://localhost:8080', help='proxy url to which requests will be made')
+parser.add_argument('--conc', type=int, default=10, help='limits number of concurrent put requests')
 parser.add_argument('--shards', type=int, default=20, help='number of shards to create')
 parser.add_argument('--iprefix', type=str, default='shard-', help='prefix of input shard')
 parser.add_argument('--fsize', type=int, default=1024, help='single file size (in bytes) inside the shard')
 parser.add_argument('--fcount', type=int, default=20, help='number of files inside single shar')
 parser.add_argument('--cleanup', type=bool, default=False, help='when true the bucket will be deleted and created so all objects will be fresh')
 args = parser.parse_args()
+if args.conc < 1:
+    parser.error('--conc must be at least 1')
 
 configuration = openapi_client.Configuration()
 configuration.debug = False
 configuration.host = ('%s/v1' % args.url)
-api_client = openapi_client.ApiClient(configuration)
+# Keep a pooled connection for each concurrent put so they are reused
+configuration.connection_pool_maxsize = max(args.conc, configuration.connection_pool_maxsize)
+api_client = openapi_client.ApiClient(configuration, pool_threads=args.conc)
 
 bucket_api = openapi_client.api.bucket_api.BucketApi(api_client)
 object_api = openapi_client.api.object_api.ObjectApi(api_client)
@@ -34,7 +39,8 @@ if not args.bucket in bucket_names.local:
     input_params = openapi_client.models.InputParameters(openapi_client.models.Actions.CREATELB)
     bucket_api.perform_operation(args.bucket, input_params)
 
-# Create and send tars
+# Create and send tars, keeping at most `args.conc` put requests in flight
+inflight = collections.deque()
 for i in range(0, args.shards):
     out = io.BytesIO()
     object_name = "%s%d%s" % (args.iprefix, i, args.ext)
@@ -45,9 +51,14 @@ for i in range(0, args.shards):
             t.size = args.fsize
             tar.addfile(t, io.BytesIO(b))
 
+    if len(inflight) >= args.conc:
+        inflight.popleft().get()
+
     print('PUT: %s' % object_name)
     if six.PY2:
-        object_api.put(args.bucket, object_name, body=out.getvalue())
+        inflight.append(object_api.put(args.bucket, object_name, body=out.getvalue(), async_req=True))
     else:
-        object_api.put(args.bucket, object_name, body=out.getvalue().decode('ISO-8859-1'))
+        inflight.append(object_api.put(args.bucket, object_name, body=out.getvalue().decode('ISO-8859-1'), async_req=True))
 
+while inflight:
+    inflight.popleft().get()